@@ -1,11 +1,18 @@
 import asyncio
+import base64
+import hashlib
 import json
+import math
+import random
+import uuid
 import websockets
 import requests
 import os
 import sys
 import signal
+import time
 import colorama
+from collections import deque
 from colorama import Fore, Style
 from aiohttp import web
 
@@ -37,6 +44,42 @@ execution_status = (
     "idle"  # Tracks the current execution status (idle, running, completed, error)
 )
 
+PROFILE_LOG_FILE = "workflow_profiles.jsonl"  # Per-run execution profiles (one JSON record per line)
+PROFILE_HISTORY_LIMIT = 200  # Only the most recent N runs per workflow feed the stats / ETA
+workflow_name = None  # Name of the loaded workflow file, used to key the profiles
+current_run_profile = None  # Profile record of the run in flight (None when idle)
+profile_records = None  # workflow -> deque of its recent run records (PROFILE_LOG_FILE read once, lazily)
+PROFILE_EXECUTION_EVENTS = [
+    "execution_start",
+    "execution_cached",
+    "executing",
+    "progress",
+    "executed",
+    "execution_success",
+    "execution_complete",
+    "execution_error",
+    "execution_interrupted",
+]
+PROFILE_TERMINAL_STATUS = {
+    "execution_success": "completed",
+    "execution_complete": "completed",
+    "execution_error": "error",
+    "execution_interrupted": "interrupted",
+}
+
+RECORD_TRAFFIC = False  # Opt-in: log every middleware request to TRAFFIC_LOG_FILE for replay
+TRAFFIC_LOG_FILE = "traffic_recording.jsonl"  # One JSON record per request (see traffic-replay.py)
+TRAFFIC_UPLOAD_SAMPLE_RATE = 0.0  # Fraction of uploads stored in full, the rest only as hash + size
+traffic_session = uuid.uuid4().hex[:8]  # Tags this process's records, the log is shared across restarts
+
+backend_ready = False  # Flipped by warm_up_backend once ComfyUI, workflow and WebSocket are all up
+readiness_pending = {}  # Warm-up step -> what it is waiting for (reported by /health)
+readiness_failure = None  # Set when the warm-up gave up on an unexpected error
+STARTUP_RETRY_INITIAL = 1  # Seconds before the first backend discovery retry
+STARTUP_RETRY_MAX = 30  # Cap for the exponential backoff between retries
+COMFYUI_REQUEST_TIMEOUT = 10  # Seconds for connectivity checks (a host dropping packets must not hang)
+OBJECT_INFO_TIMEOUT = 60  # Seconds for /object_info, which is slow on a cold ComfyUI
+
 
 def cancel_workflow(prompt_id):
     """Cancel workflows using the global interrupt endpoint"""
@@ -85,7 +128,7 @@ def test_comfyui_connection(server_addr, port_num):
             f"{Fore.LIGHTYELLOW_EX}Testing connectivity to ComfyUI at{Fore.LIGHTBLACK_EX} {url} {Style.RESET_ALL}"
         )
 
-        response = requests.get(url)
+        response = requests.get(url, timeout=COMFYUI_REQUEST_TIMEOUT)
         if response.status_code == 200:
             print(f"{Fore.LIGHTGREEN_EX}ComfyUI connection successful{Style.RESET_ALL}")
             # [OPTIONAL]
@@ -200,6 +243,266 @@ def update_workflow_with_image(workflow, image_name):
     return updated
 
 
+def normalize_workflow_name(name):
+    """Strip directory and .json extension so 'foo', 'foo.json' and 'dir/foo.json' share profiles"""
+    name = os.path.basename(name or "")
+    if name.endswith(".json"):
+        name = name[: -len(".json")]
+    return name
+
+
+def start_run_profile(name, workflow):
+    """Create an empty profile record for a new run of the workflow
+
+    The run stays "queued" until ComfyUI starts executing it (ComfyUI is shared, time spent
+    behind other clients' prompts must not count into the duration).
+    """
+    return {
+        "workflow": normalize_workflow_name(name),
+        "prompt_id": None,
+        "submitted_at": time.time(),
+        "started_at": None,
+        "status": "queued",
+        "duration": None,
+        "nodes": {},  # node_id -> {class_type, start, end, duration, cached}
+        "step_rates": [],  # steps/s samples from consecutive progress events
+        # Runtime-only bookkeeping (dropped before persisting)
+        "_t0": None,  # Monotonic start of execution in ComfyUI
+        "_active_node": None,
+        "_last_progress": None,  # (node_id, value, max, monotonic time)
+        "_last_rate": None,  # (node_id, steps/s) of the latest step rate sample
+        "_class_types": {
+            node_id: node.get("class_type")
+            for node_id, node in workflow.items()
+            if isinstance(node, dict)
+        },
+    }
+
+
+def _close_active_node(run, now):
+    """Stamp the end time of the node that is currently executing"""
+    node_id = run["_active_node"]
+    if node_id is None:
+        return
+    entry = run["nodes"][node_id]
+    if entry["end"] is None:
+        entry["end"] = round(now - run["_t0"], 3)
+        entry["duration"] = round(entry["end"] - entry["start"], 3)
+    run["_active_node"] = None
+
+
+def record_profile_event(run, msg_type, data):
+    """Update the run profile from a single ComfyUI WebSocket event"""
+    if run is None or msg_type not in PROFILE_EXECUTION_EVENTS:
+        return
+    if not isinstance(data, dict):
+        data = {}
+    now = time.monotonic()
+
+    # The clock starts with execution_start, the other events cover a missed one
+    if run["_t0"] is None:
+        run["_t0"] = now
+        run["started_at"] = time.time()
+        run["status"] = "running"
+    offset = round(now - run["_t0"], 3)
+
+    if msg_type == "execution_cached":
+        nodes = data.get("nodes")
+        for node_id in nodes if isinstance(nodes, list) else []:
+            node_id = str(node_id)
+            run["nodes"][node_id] = {
+                "class_type": run["_class_types"].get(node_id),
+                "start": offset,
+                "end": offset,
+                "duration": 0.0,
+                "cached": True,
+            }
+
+    elif msg_type == "executing":
+        _close_active_node(run, now)
+        node_id = data.get("node")
+        if isinstance(node_id, (str, int)):
+            node_id = str(node_id)
+            run["nodes"][node_id] = {
+                "class_type": run["_class_types"].get(node_id),
+                "start": offset,
+                "end": None,
+                "duration": None,
+                "cached": False,
+            }
+            run["_active_node"] = node_id
+            run["_last_progress"] = None
+
+    elif msg_type == "progress":
+        value = data.get("value", 0)
+        max_val = data.get("max", 0)
+        node_id = run["_active_node"]
+        last = run["_last_progress"]
+        # Only consecutive events of the same sampler pass give a meaningful rate
+        if last and last[0] == node_id and value > last[1] and now > last[3]:
+            rate = round((value - last[1]) / (now - last[3]), 3)
+            run["step_rates"].append(rate)
+            run["_last_rate"] = (node_id, rate)
+        run["_last_progress"] = (node_id, value, max_val, now)
+
+    elif msg_type in ["execution_success", "execution_complete", "execution_error", "execution_interrupted"]:
+        # Freeze the run at the terminal event so trailing waits don't inflate the duration
+        _close_active_node(run, now)
+        run["status"] = PROFILE_TERMINAL_STATUS[msg_type]
+        run["duration"] = offset
+
+
+def finish_run_profile(run, status):
+    """Close the run, persist it to PROFILE_LOG_FILE and return the stored record"""
+    if run is None:
+        return None
+    now = time.monotonic()
+    _close_active_node(run, now)
+    # A terminal event already settled status and duration, keep those
+    if run["duration"] is None:
+        run["status"] = status
+        # Never started in ComfyUI (e.g. timed out while queued): no duration to report
+        if run["_t0"] is not None:
+            run["duration"] = round(now - run["_t0"], 3)
+
+    record = {key: value for key, value in run.items() if not key.startswith("_")}
+    try:
+        with open(PROFILE_LOG_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(
+            f"{Fore.LIGHTRED_EX}Error saving execution profile: \n{Fore.LIGHTBLACK_EX}{e}{Style.RESET_ALL}"
+        )
+    _cached_profile_records(record["workflow"]).append(record)
+    return record
+
+
+def _cached_profile_records(name):
+    """Return the in-memory history of a workflow, reading PROFILE_LOG_FILE on first use"""
+    global profile_records
+
+    if profile_records is None:
+        profile_records = {}
+        if os.path.exists(PROFILE_LOG_FILE):
+            with open(PROFILE_LOG_FILE, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Skip partially written lines
+                    profile_records.setdefault(
+                        record.get("workflow"), deque(maxlen=PROFILE_HISTORY_LIMIT)
+                    ).append(record)
+
+    return profile_records.setdefault(name, deque(maxlen=PROFILE_HISTORY_LIMIT))
+
+
+def load_profile_records(name, status="completed"):
+    """Return the most recent runs of a workflow (optionally filtered by status)"""
+    records = _cached_profile_records(normalize_workflow_name(name))
+    return [record for record in records if not status or record.get("status") == status]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None for an empty list)"""
+    # NOTE: traffic-replay.py has a copy of this helper, keep both in sync
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize_profiles(records, slowest=5):
+    """Aggregate run records into per-node p50/p95 durations and the slowest nodes"""
+    node_durations = {}
+    class_types = {}
+    for record in records:
+        for node_id, entry in record.get("nodes", {}).items():
+            # Cached nodes cost nothing and would drag the percentiles to zero
+            if entry.get("cached") or entry.get("duration") is None:
+                continue
+            node_durations.setdefault(node_id, []).append(entry["duration"])
+            class_types[node_id] = entry.get("class_type")
+
+    nodes = {
+        node_id: {
+            "class_type": class_types[node_id],
+            "runs": len(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+        }
+        for node_id, durations in node_durations.items()
+    }
+    slowest_nodes = sorted(
+        ({"node": node_id, **stats} for node_id, stats in nodes.items()),
+        key=lambda stats: stats["p50"],
+        reverse=True,
+    )[:slowest]
+
+    durations = [r["duration"] for r in records if r.get("duration") is not None]
+    step_rates = [rate for r in records for rate in r.get("step_rates", [])]
+
+    return {
+        "runs": len(records),
+        "duration": {"p50": percentile(durations, 50), "p95": percentile(durations, 95)},
+        "steps_per_second": {
+            "p50": percentile(step_rates, 50),
+            "p95": percentile(step_rates, 95),
+        },
+        "nodes": nodes,
+        "slowest_nodes": slowest_nodes,
+    }
+
+
+def estimate_completion(name, run=None):
+    """Predict the remaining seconds of a run (or the full duration of a queued one) from history
+
+    Returns None when there is no history to base the estimate on.
+    """
+    summary = summarize_profiles(load_profile_records(name))
+    if not summary["runs"]:
+        return None
+
+    # Not started yet: the full historical run time (wait behind other prompts is unknown)
+    if run is None or run["_t0"] is None:
+        return summary["duration"]["p50"]
+
+    now = time.monotonic()
+    elapsed = now - run["_t0"]
+    node_stats = summary["nodes"]
+
+    # Nodes that have not started yet are expected to take their historical median
+    remaining = sum(
+        stats["p50"]
+        for node_id, stats in node_stats.items()
+        if node_id not in run["nodes"]
+    )
+
+    active = run["_active_node"]
+    if active is not None:
+        last = run["_last_progress"]
+        # Prefer the rate measured on the active sampler (an earlier sampler, e.g. base vs
+        # refiner, may have a different step cost), fall back to the historical median
+        last_rate = run["_last_rate"]
+        if last_rate and last_rate[0] == active:
+            rate = last_rate[1]
+        else:
+            rate = summary["steps_per_second"]["p50"]
+        if last and last[0] == active and last[2] and rate:
+            # Sampler node: extrapolate from the remaining steps and the step rate
+            remaining += max(last[2] - last[1], 0) / rate
+        elif active in node_stats:
+            active_elapsed = elapsed - run["nodes"][active]["start"]
+            remaining += max(node_stats[active]["p50"] - active_elapsed, 0)
+
+    # Before the first node event only the whole-run history is available
+    if not run["nodes"]:
+        remaining = max(summary["duration"]["p50"] - elapsed, 0)
+
+    return round(remaining, 3)
+
+
 async def connect_websocket(server, port):
     """Connect to the ComfyUI WebSocket endpoint"""
     global ws_connection, session_id
@@ -246,7 +549,7 @@ async def connect_websocket(server, port):
 
 async def execute_workflow(workflow_json):
     """Execute the provided workflow - shared by both modes"""
-    global current_prompt_id, ws_connection, session_id, execution_status
+    global current_prompt_id, ws_connection, session_id, execution_status, current_run_profile
 
     execution_status = "running"
 
@@ -278,10 +581,19 @@ async def execute_workflow(workflow_json):
         current_prompt_id = prompt_id  # Store globally for signal handler
         print(f"Workflow submitted successfully. Prompt ID: {prompt_id}")
 
+        # Start profiling this run (node timeline + sampler step rate)
+        # (kept locally too, a new run may replace the global while this one drains)
+        run_profile = start_run_profile(workflow_name or curr_workflow, workflow_json)
+        run_profile["prompt_id"] = prompt_id
+        current_run_profile = run_profile
+
         # Check for node errors
         if result.get("node_errors") and len(result.get("node_errors")) > 0:
             print(f"Node errors detected: {result.get('node_errors')}")
             execution_status = "error"
+            finish_run_profile(run_profile, execution_status)
+            if current_run_profile is run_profile:
+                current_run_profile = None
             return False
 
         # Subscribe to this prompt
@@ -303,7 +615,14 @@ async def execute_workflow(workflow_json):
                     message = await asyncio.wait_for(ws_connection.recv(), timeout=180)  # 3-minute timeout
 
                     msg_data = json.loads(message)
+                    if not isinstance(msg_data, dict):
+                        continue  # Binary previews and other non-event messages
                     msg_type = msg_data.get("type")
+                    # Profiling must never abort monitoring of a healthy run
+                    try:
+                        record_profile_event(run_profile, msg_type, msg_data.get("data"))
+                    except Exception as e:
+                        print(f"{Fore.YELLOW}Error profiling event {msg_type}: {e}{Style.RESET_ALL}")
 
                     if msg_type != "status":
                         print(f"EVENT: {msg_type}")
@@ -356,6 +675,14 @@ async def execute_workflow(workflow_json):
             print(
                 "All events processed. Check the output folder for your generated image."
             )
+            # Persist the execution profile of this run
+            profile = finish_run_profile(run_profile, execution_status)
+            if current_run_profile is run_profile:
+                current_run_profile = None
+            if profile:
+                print(
+                    f"{Fore.LIGHTBLACK_EX}Run profile saved: {profile['duration']}s total, {len(profile['nodes'])} nodes{Style.RESET_ALL}"
+                )
             # Clear the prompt ID since execution is complete
             current_prompt_id = None
             return True
@@ -363,6 +690,9 @@ async def execute_workflow(workflow_json):
         except Exception as e:
             print(f"Error monitoring events: {e}")
             execution_status = "error"
+            finish_run_profile(run_profile, execution_status)
+            if current_run_profile is run_profile:
+                current_run_profile = None
 
             # If we encounter an error, attempt to cancel the workflow
             if current_prompt_id:
@@ -375,24 +705,217 @@ async def execute_workflow(workflow_json):
         return False
 
 
+async def receive_upload(request):
+    """Stream the first multipart field of the request to a temp file (hashing it on the way)
+
+    Done at most once per request: the traffic recorder calls it before the handler so that
+    rejected uploads are recorded too, the upload handler then reuses the result.
+    Returns None when the request carries no file field.
+    """
+    if "upload_file" in request:
+        return request["upload_file"]
+
+    request["upload_file"] = None
+    reader = await request.multipart()
+    field = await reader.next()
+    if field is None or not field.filename:
+        return None
+
+    temp_file_path = os.path.join(os.getcwd(), "temp_" + os.path.basename(field.filename))
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(temp_file_path, "wb") as f:
+        while True:
+            chunk = await field.read_chunk()
+            if not chunk:
+                break
+            sha256.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+
+    request["upload_file"] = {
+        "field": field.name,
+        "filename": field.filename,
+        "path": temp_file_path,
+        "size": size,
+        "sha256": sha256.hexdigest(),
+    }
+    return request["upload_file"]
+
+
+def describe_upload(upload):
+    """Summarise an uploaded file for the traffic recording (hash + size, full body if sampled)"""
+    description = {
+        key: upload[key] for key in ("field", "filename", "size", "sha256")
+    }
+    if random.random() < TRAFFIC_UPLOAD_SAMPLE_RATE:
+        with open(upload["path"], "rb") as f:
+            description["data"] = base64.b64encode(f.read()).decode("ascii")
+    return description
+
+
+@web.middleware
+async def traffic_recorder_middleware(request, handler):
+    """Record timing, endpoint and payload of each request so it can be replayed later"""
+    received_at = time.time()
+    now = time.monotonic()
+
+    # Request bodies (JSON prompts etc.) are small, keep them byte for byte: as text when they
+    # are valid UTF-8, base64 otherwise. Multipart uploads are spooled to a temp file once
+    # (shared with the upload handler) and recorded as hash + size.
+    body = None
+    upload = None
+    if request.can_read_body:
+        if request.content_type.startswith("multipart/"):
+            try:
+                upload = await receive_upload(request)
+            except Exception as e:
+                print(
+                    f"{Fore.LIGHTRED_EX}Error reading upload for recording: \n{Fore.LIGHTBLACK_EX}{e}{Style.RESET_ALL}"
+                )
+        else:
+            body = await request.read()
+
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        record = {
+            "session": traffic_session,
+            "ts": round(received_at, 4),
+            "method": request.method,
+            "path": request.path_qs,
+            "endpoint": resource.canonical if resource else request.path,
+            "status": status,
+            "latency": round(time.monotonic() - now, 4),
+        }
+        if body:
+            try:
+                record["body"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                record["body_b64"] = base64.b64encode(body).decode("ascii")
+            record["content_type"] = request.content_type
+        if upload:
+            try:
+                record["upload"] = describe_upload(upload)
+            finally:
+                # Rejected uploads never reach the handler's own clean-up
+                if os.path.exists(upload["path"]):
+                    os.remove(upload["path"])
+
+        try:
+            with open(TRAFFIC_LOG_FILE, "a") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except Exception as e:
+            print(
+                f"{Fore.LIGHTRED_EX}Error recording traffic: \n{Fore.LIGHTBLACK_EX}{e}{Style.RESET_ALL}"
+            )
+
+
+def readiness_text():
+    """Summarise what the warm-up is still waiting for"""
+    if readiness_failure:
+        return readiness_failure
+    if not readiness_pending:
+        return "starting"
+    return "; ".join(readiness_pending.values())
+
+
 async def handle_health_check(request):
-    """Simple health check endpoint"""
-    return web.Response(text="ComfyUI Workflow Runner is running")
+    """Health check endpoint, 503 until the backend warm-up has finished"""
+    if not backend_ready:
+        return web.Response(
+            text=f"ComfyUI Workflow Runner is running, not ready: {readiness_text()}",
+            status=503,
+        )
+    return web.Response(text="ComfyUI Workflow Runner is running and ready")
+
+
+def not_ready_response():
+    """503 answer for endpoints that need the backend while the warm-up is still running"""
+    return web.Response(
+        text=f"Workflow runner is not ready yet: {readiness_text()}", status=503
+    )
+
+
+async def handle_profile(request):
+    """Return per-node p50/p95 durations and the slowest nodes of a workflow's past runs"""
+    name = request.match_info["workflow"]
+
+    try:
+        records = load_profile_records(name)
+    except Exception as e:
+        print(f"{Fore.LIGHTRED_EX}Error loading profiles: {str(e)}{Style.RESET_ALL}")
+        return web.Response(text=f"Error loading profiles: {str(e)}", status=500)
+
+    if not records:
+        return web.Response(text=f"No profiled runs found for workflow {name}", status=404)
+
+    summary = summarize_profiles(records)
+    summary["workflow"] = normalize_workflow_name(name)
+    return web.json_response(summary)
+
+
+async def handle_eta(request):
+    """Estimate completion of the running workflow, or the duration of the next queued run"""
+    name = workflow_name or curr_workflow
+    run = current_run_profile
+
+    try:
+        estimate = estimate_completion(name, run)
+    except Exception as e:
+        print(f"{Fore.LIGHTRED_EX}Error estimating completion: {str(e)}{Style.RESET_ALL}")
+        return web.Response(text=f"Error estimating completion: {str(e)}", status=500)
+
+    if run:
+        # queued (waiting in ComfyUI) -> running -> outcome once the terminal event arrived
+        status = run["status"]
+    else:
+        # "queued" also covers the gap between /queue and ComfyUI accepting the prompt
+        status = "queued" if execution_status == "running" else "idle"
+
+    result = {
+        "workflow": normalize_workflow_name(name),
+        "status": status,
+        "prompt_id": run["prompt_id"] if run else None,
+        "elapsed": round(time.monotonic() - run["_t0"], 3) if run and run["_t0"] is not None else 0,
+        "remaining": estimate,
+        "estimated_completion": round(time.time() + estimate, 3) if estimate is not None else None,
+    }
+    return web.json_response(result)
 
 
 async def handle_queue(request):
     """Handle queue request to execute the current workflow"""
     global workflow_json, execution_status
 
+    if not backend_ready:
+        return not_ready_response()
+
     if execution_status == "running":
         return web.Response(text="Workflow is already running", status=400)
 
     if not workflow_json:
         return web.Response(text="No workflow loaded", status=400)
 
+    # Estimate before scheduling, a failure here must not turn a started run into a 500
+    try:
+        estimate = estimate_completion(workflow_name or curr_workflow)
+    except Exception as e:
+        print(f"{Fore.LIGHTRED_EX}Error estimating completion: {str(e)}{Style.RESET_ALL}")
+        estimate = None
+
     print(f"{Fore.LIGHTCYAN_EX}Received request to execute workflow{Style.RESET_ALL}")
     asyncio.create_task(execute_workflow(workflow_json))
 
+    if estimate is not None:
+        return web.Response(text=f"Workflow execution started (estimated duration: {estimate:.1f}s)")
     return web.Response(text="Workflow execution started")
 
 
@@ -400,6 +923,9 @@ async def handle_upload_image(request):
     """Handle image upload and update LoadImage nodes in workflow"""
     global workflow_json, execution_status
 
+    if not backend_ready:
+        return not_ready_response()
+
     if execution_status == "running":
         return web.Response(
             text="Cannot upload image while workflow is running", status=400
@@ -409,26 +935,17 @@ async def handle_upload_image(request):
         return web.Response(text="No workflow loaded", status=400)
 
     try:
-        # Process the multipart form data
-        reader = await request.multipart()
-
-        # Get the image field
-        field = await reader.next()
-        print(f"Field name: {field.name}, Filename: {field.filename}")
-
-        if field.name != "image":
+        # Process the multipart form data (already spooled if the traffic recorder is on)
+        upload = await receive_upload(request)
+        if upload:
+            print(f"Field name: {upload['field']}, Filename: {upload['filename']}")
+
+        if not upload or upload["field"] != "image":
+            if upload and os.path.exists(upload["path"]):
+                os.remove(upload["path"])
             return web.Response(text="Missing image field", status=400)
 
-        # Save to temporary file
-        filename = field.filename
-        temp_file_path = os.path.join(os.getcwd(), "temp_" + filename)
-
-        with open(temp_file_path, "wb") as f:
-            while True:
-                chunk = await field.read_chunk()
-                if not chunk:
-                    break
-                f.write(chunk)
+        temp_file_path = upload["path"]
 
         # Now upload to ComfyUI
         with open(temp_file_path, "rb") as f:
@@ -478,7 +995,10 @@ async def handle_upload_image(request):
 async def handle_update_prompt(request):
     """Update text prompt using semantic identifiers"""
     global workflow_json, execution_status
-    
+
+    if not backend_ready:
+        return not_ready_response()
+
     if execution_status == "running":
         return web.Response(text="Cannot update prompts while workflow is running", status=400)
     
@@ -548,7 +1068,13 @@ async def handle_interrupt(request):
 
 async def start_minimal_http_server():
     """Start a minimal HTTP server"""
-    app = web.Application()
+    middlewares = []
+    if RECORD_TRAFFIC:
+        print(
+            f"{Fore.LIGHTYELLOW_EX}Recording traffic to:{Fore.LIGHTBLACK_EX} {TRAFFIC_LOG_FILE} {Style.RESET_ALL}"
+        )
+        middlewares.append(traffic_recorder_middleware)
+    app = web.Application(middlewares=middlewares)
 
     # Routes
     app.router.add_get("/health", handle_health_check)
@@ -556,6 +1082,8 @@ async def start_minimal_http_server():
     app.router.add_post("/upload/image", handle_upload_image)
     app.router.add_post('/update/prompt', handle_update_prompt)
     app.router.add_post('/interrupt', handle_interrupt)
+    app.router.add_get("/profile/{workflow}", handle_profile)
+    app.router.add_get("/eta", handle_eta)
 
     # Start the server
     runner = web.AppRunner(app)
@@ -577,9 +1105,10 @@ async def run_workflow_and_monitor(
 ):
     """Load workflow, execute it, and exit"""
 
-    global current_prompt_id, server, port
+    global current_prompt_id, server, port, workflow_name
     server = server_addr
     port = port_num
+    workflow_name = workflow_file
 
     # First, test connectivity to ComfyUI
     if not test_comfyui_connection(server, port):
@@ -605,29 +1134,122 @@ async def run_workflow_and_monitor(
     return result
 
 
+def fetch_object_info(server_addr, port_num):
+    """Fetch the node definitions from ComfyUI (None if unavailable)"""
+    try:
+        response = requests.get(
+            f"http://{server_addr}:{port_num}/object_info", timeout=OBJECT_INFO_TIMEOUT
+        )
+        if response.status_code == 200:
+            return response.json()
+        print(
+            f"{Fore.LIGHTRED_EX}Failed to fetch /object_info: {Fore.LIGHTBLACK_EX}{response.status_code}{Style.RESET_ALL}"
+        )
+    except Exception as e:
+        print(
+            f"{Fore.LIGHTRED_EX}Error fetching /object_info: \n{Fore.LIGHTBLACK_EX}{e}{Style.RESET_ALL}"
+        )
+    return None
+
+
+def find_unknown_node_types(workflow, node_definitions):
+    """Return the class_types of the workflow that ComfyUI has no definition for"""
+    if not node_definitions:
+        return []  # Nothing to check against (e.g. fake-comfyui-server.py answers {})
+    return sorted(
+        {
+            node.get("class_type")
+            for node in workflow.values()
+            if isinstance(node, dict) and node.get("class_type") not in node_definitions
+        }
+    )
+
+
+async def retry_with_backoff(description, attempt):
+    """Await attempt() until it returns a result (not None / False), backing off exponentially
+
+    While retrying, the step is listed in readiness_pending so /health can tell what is missing.
+    """
+    delay = STARTUP_RETRY_INITIAL
+    readiness_pending[description] = f"waiting for {description}"
+    while True:
+        result = await attempt()
+        if result is not None and result is not False:
+            readiness_pending.pop(description, None)
+            return result
+        readiness_pending[description] = f"{description} not available, retrying in {delay}s"
+        print(
+            f"{Fore.YELLOW}{description} not available, retrying in {delay}s...{Style.RESET_ALL}"
+        )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, STARTUP_RETRY_MAX)
+
+
+async def warm_up_backend(workflow_file):
+    """Bring the backend up in the background and flip to ready once everything is in place
+
+    The workflow is loaded (and retried) while ComfyUI is still being discovered. Once
+    ComfyUI answers, /object_info is fetched and the WebSocket opened concurrently. The
+    node definitions warm ComfyUI's cache and are used to check the workflow's node types.
+    """
+    global workflow_json, backend_ready, readiness_failure
+    loop = asyncio.get_running_loop()
+
+    async def load_workflow():
+        return await loop.run_in_executor(None, load_workflow_from_file, workflow_file)
+
+    async def discover_comfyui():
+        return await loop.run_in_executor(None, test_comfyui_connection, server, port)
+
+    async def prefetch_object_info():
+        return await loop.run_in_executor(None, fetch_object_info, server, port)
+
+    async def connect_backend():
+        await retry_with_backoff("ComfyUI", discover_comfyui)
+        node_definitions, _ = await asyncio.gather(
+            retry_with_backoff("ComfyUI /object_info", prefetch_object_info),
+            retry_with_backoff(
+                "ComfyUI WebSocket", lambda: connect_websocket(server, port)
+            ),
+        )
+        return node_definitions
+
+    try:
+        loaded_workflow, node_definitions = await asyncio.gather(
+            retry_with_backoff(f"workflow {workflow_file}", load_workflow),
+            connect_backend(),
+        )
+    except Exception as e:
+        readiness_failure = f"warm-up failed: {e}"
+        print(
+            f"{Fore.LIGHTRED_EX}Error warming up backend: \n{Fore.LIGHTBLACK_EX}{e}{Style.RESET_ALL}"
+        )
+        return False
+
+    unknown_node_types = find_unknown_node_types(loaded_workflow, node_definitions)
+    if unknown_node_types:
+        # ComfyUI will reject the prompt with node_errors, flag it now rather than on /queue
+        print(
+            f"{Fore.LIGHTRED_EX}Workflow uses node types unknown to ComfyUI:{Fore.LIGHTBLACK_EX} {', '.join(map(str, unknown_node_types))}{Style.RESET_ALL}"
+        )
+
+    workflow_json = loaded_workflow
+    backend_ready = True
+    print(f"{Fore.LIGHTGREEN_EX}Workflow runner is READY{Style.RESET_ALL}")
+    return True
+
+
 async def run_continuous_mode(
     server_addr="127.0.0.1", port_num=8188, workflow_file=curr_workflow
 ):
     """Run in continuous mode - load workflow but don't execute until requested"""
 
-    global server, port, MIDDLEWARE_HTTP_PORT, workflow_json
+    global server, port, MIDDLEWARE_HTTP_PORT, workflow_name
     server = server_addr
     port = port_num
-    workflow_json = workflow_file
+    workflow_name = workflow_file
 
-    # First, test connectivity to ComfyUI
-    if not test_comfyui_connection(server, port):
-        print(
-            f"{Fore.LIGHTRED_EX}Failed to connect to ComfyUI server. Please make sure it's running.{Style.RESET_ALL}"
-        )
-        return False
-
-    # Load the workflow
-    workflow_json = load_workflow_from_file(workflow_file)
-    if not workflow_json:
-        return False
-
-    # Start HTTP server
+    # Start HTTP server right away, it reports not-ready until the warm-up is done
     http_runner = await start_minimal_http_server()
     print(
         f"{Fore.LIGHTGREEN_EX}Server is now listening on:{Fore.LIGHTBLACK_EX} http://{server}:{MIDDLEWARE_HTTP_PORT} {Style.RESET_ALL}"
@@ -636,16 +1258,21 @@ async def run_continuous_mode(
     print(
         f"""
     {Fore.LIGHTCYAN_EX}Available endpoints:{Style.RESET_ALL}
-    - GET /health - Health check
+    - GET /health - Health check (503 until ready)
     - GET /queue - Trigger workflow execution
     - POST /upload/image - Upload an image and update the workflow
     - POST /update/prompt - Update text in a prompt node
     - POST /interrupt - Stop a running workflow
+    - GET /profile/{{workflow}} - Per-node p50/p95 durations of past runs
+    - GET /eta - Estimated completion of the running / next queued workflow
 
     {Fore.LIGHTYELLOW_EX}Auto-execute on upload:{Style.RESET_ALL} {"Enabled" if AUTO_EXECUTE_ON_UPLOAD else "Disabled"}
     """
     )
 
+    # Discover ComfyUI, load the workflow, prefetch /object_info and open the WebSocket
+    warm_up_task = asyncio.create_task(warm_up_backend(workflow_file))
+
     try:
         # Keep the server running until interrupted
         while True:
@@ -653,8 +1280,9 @@ async def run_continuous_mode(
             # global ws_connection
             # Add periodic reconnection to keep connection fresh
             try:
+                # The warm-up owns the connection until the runner is ready
                 # if ws_connection is None or getattr(ws_connection, "closed", False):
-                if ws_connection is None or ws_connection.closed:
+                if backend_ready and (ws_connection is None or ws_connection.closed):
                     # print("Refreshing WebSocket connection...")
                     # await connect_websocket(server, port)
                     print(f"{Fore.YELLOW}WebSocket connection needs refresh. Reconnecting...{Style.RESET_ALL}")
@@ -667,6 +1295,7 @@ async def run_continuous_mode(
         print("Server shutdown requested")
     finally:
         print("Cleaning up resources...")
+        warm_up_task.cancel()
         await http_runner.cleanup()
 
     return True
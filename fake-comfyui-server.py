@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import json
+import uuid
+import colorama
+from colorama import Fore, Style
+from aiohttp import web, WSMsgType
+
+
+# Initialize colorama for cross-platform colored terminal output
+colorama.init()
+
+
+# A stand-in for the ComfyUI server (no GPU needed): it accepts workflows on /prompt and
+# "executes" them by emitting the same WebSocket events ComfyUI sends, with fixed delays.
+server = "127.0.0.1"
+port = 8188
+NODE_DELAY = 0.05  # Seconds spent on every (non-sampler) node
+STEP_DELAY = 0.02  # Seconds spent on every sampler step (KSampler* nodes)
+
+clients = {}  # sid -> WebSocketResponse
+prompt_queue = None  # asyncio.Queue of (prompt_id, client_id, workflow) waiting to run
+interrupted = False  # Set by /interrupt, checked between nodes / steps
+
+
+async def send_event(client_id, msg_type, data):
+    """Send an event to the client that submitted the prompt (if still connected)"""
+    ws = clients.get(client_id)
+    if ws is None or ws.closed:
+        return
+    try:
+        await ws.send_str(json.dumps({"type": msg_type, "data": data}))
+    except Exception:
+        pass  # Client went away mid-run, keep executing like ComfyUI does
+
+
+async def execute_prompt(prompt_id, client_id, workflow):
+    """Walk the workflow nodes in order and emit ComfyUI-style execution events"""
+    global interrupted
+    interrupted = False
+
+    await send_event(client_id, "execution_start", {"prompt_id": prompt_id})
+    await send_event(client_id, "execution_cached", {"nodes": [], "prompt_id": prompt_id})
+
+    for node_id, node in workflow.items():
+        if interrupted:
+            await send_event(
+                client_id,
+                "execution_interrupted",
+                {"prompt_id": prompt_id, "node_id": node_id},
+            )
+            return
+
+        await send_event(client_id, "executing", {"node": node_id, "prompt_id": prompt_id})
+
+        if str(node.get("class_type", "")).startswith("KSampler"):
+            steps = int(node.get("inputs", {}).get("steps", 20))
+            for step in range(1, steps + 1):
+                if interrupted:
+                    break
+                await asyncio.sleep(STEP_DELAY)
+                await send_event(
+                    client_id,
+                    "progress",
+                    {"value": step, "max": steps, "prompt_id": prompt_id, "node": node_id},
+                )
+        else:
+            await asyncio.sleep(NODE_DELAY)
+
+        await send_event(
+            client_id, "executed", {"node": node_id, "output": {}, "prompt_id": prompt_id}
+        )
+
+    await send_event(client_id, "executing", {"node": None, "prompt_id": prompt_id})
+    await send_event(client_id, "execution_success", {"prompt_id": prompt_id})
+
+
+async def prompt_worker():
+    """Run queued prompts one at a time, like ComfyUI's single execution thread"""
+    while True:
+        prompt_id, client_id, workflow = await prompt_queue.get()
+        try:
+            await execute_prompt(prompt_id, client_id, workflow)
+        except Exception as e:
+            print(f"{Fore.LIGHTRED_EX}Error executing prompt {prompt_id}: {e}{Style.RESET_ALL}")
+        finally:
+            prompt_queue.task_done()
+
+
+async def handle_ws(request):
+    """WebSocket endpoint: greet with a status message carrying the session ID"""
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+
+    sid = request.query.get("clientId") or uuid.uuid4().hex
+    clients[sid] = ws
+    await ws.send_str(
+        json.dumps(
+            {
+                "type": "status",
+                "data": {
+                    "status": {"exec_info": {"queue_remaining": prompt_queue.qsize()}},
+                    "sid": sid,
+                },
+            }
+        )
+    )
+
+    try:
+        async for msg in ws:
+            if msg.type == WSMsgType.ERROR:
+                break
+            # Client messages (e.g. subscribe_to_prompt) need no answer
+    finally:
+        if clients.get(sid) is ws:
+            del clients[sid]
+    return ws
+
+
+async def handle_prompt(request):
+    """Queue a workflow for fake execution"""
+    data = await request.json()
+    workflow = data.get("prompt")
+    if not isinstance(workflow, dict):
+        return web.json_response({"error": "Missing prompt", "node_errors": {}}, status=400)
+
+    prompt_id = str(uuid.uuid4())
+    await prompt_queue.put((prompt_id, data.get("client_id"), workflow))
+    return web.json_response(
+        {"prompt_id": prompt_id, "number": prompt_queue.qsize(), "node_errors": {}}
+    )
+
+
+async def handle_upload_image(request):
+    """Accept an image upload and echo its name back"""
+    reader = await request.multipart()
+    field = await reader.next()
+    if field is None or field.name != "image":
+        return web.Response(text="Missing image field", status=400)
+
+    while await field.read_chunk():
+        pass  # Discard the data, only the name matters to the runner
+
+    return web.json_response({"name": field.filename, "subfolder": "", "type": "input"})
+
+
+async def handle_interrupt(request):
+    """Interrupt the prompt that is currently executing"""
+    global interrupted
+    interrupted = True
+    return web.json_response({})
+
+
+async def handle_system_stats(request):
+    """Minimal /system_stats answer used for connectivity checks"""
+    return web.json_response(
+        {"system": {"os": "fake", "python_version": "fake"}, "devices": []}
+    )
+
+
+async def handle_object_info(request):
+    """No node definitions, the fake accepts any class_type"""
+    return web.json_response({})
+
+
+async def start_background_tasks(app):
+    """Create the prompt queue and its worker once the event loop is running"""
+    global prompt_queue
+    prompt_queue = asyncio.Queue()
+    app["prompt_worker"] = asyncio.create_task(prompt_worker())
+
+
+async def cleanup_background_tasks(app):
+    """Stop the prompt worker on shutdown"""
+    app["prompt_worker"].cancel()
+
+
+def build_app():
+    """Create the fake ComfyUI aiohttp application"""
+    app = web.Application()
+    app.router.add_get("/ws", handle_ws)
+    app.router.add_post("/prompt", handle_prompt)
+    app.router.add_post("/upload/image", handle_upload_image)
+    app.router.add_post("/interrupt", handle_interrupt)
+    app.router.add_get("/system_stats", handle_system_stats)
+    app.router.add_get("/object_info", handle_object_info)
+    app.on_startup.append(start_background_tasks)
+    app.on_cleanup.append(cleanup_background_tasks)
+    return app
+
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fake ComfyUI server for testing the workflow runner without a GPU"
+    )
+    parser.add_argument("--host", default=server)
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--node-delay", type=float, default=NODE_DELAY, help="Seconds per node")
+    parser.add_argument("--step-delay", type=float, default=STEP_DELAY, help="Seconds per sampler step")
+    args = parser.parse_args()
+
+    NODE_DELAY = args.node_delay
+    STEP_DELAY = args.step_delay
+
+    print(
+        f"{Fore.LIGHTCYAN_EX}Starting fake ComfyUI server on:{Fore.LIGHTBLACK_EX} http://{args.host}:{args.port} {Style.RESET_ALL}"
+    )
+    web.run_app(build_app(), host=args.host, port=args.port, print=None)
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import sys
+import time
+import aiohttp
+import colorama
+from colorama import Fore, Style
+
+
+# Initialize colorama for cross-platform colored terminal output
+colorama.init()
+
+
+# Replays a recording made by the runner's traffic recorder (RECORD_TRAFFIC = True in
+# comfyui-workflow-runner.py) against a running middleware, e.g. one backed by fake-comfyui-server.py.
+TARGET = "http://127.0.0.1:8189"
+RECORDING_FILE = "traffic_recording.jsonl"
+MAX_CONCURRENCY = 8  # In-flight request cap for --speed max
+REQUEST_TIMEOUT = 60  # Seconds before a replayed request counts as an error
+
+
+def load_recording(recording_file, session=None):
+    """Load the recorded requests with a replay offset "t" (seconds) each
+
+    The recording file is appended to by every runner session. Offsets are computed per
+    session and the sessions are laid out back to back, in the order they were recorded.
+    """
+    if not os.path.exists(recording_file):
+        print(
+            f"{Fore.LIGHTRED_EX}Error: Recording file '{recording_file}' not found.{Style.RESET_ALL}"
+        )
+        return None
+
+    records = []
+    with open(recording_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Skip partially written lines
+            if session and record.get("session") != session:
+                continue
+            records.append(record)
+
+    sessions = {}
+    for record in records:
+        sessions.setdefault(record.get("session"), []).append(record)
+
+    timeline = []
+    base = 0.0
+    for session_records in sorted(sessions.values(), key=lambda rs: min(r["ts"] for r in rs)):
+        session_records.sort(key=lambda record: record["ts"])
+        start = session_records[0]["ts"]
+        for record in session_records:
+            record["t"] = base + record["ts"] - start
+            timeline.append(record)
+        base = timeline[-1]["t"]
+    return timeline
+
+
+def build_upload(upload):
+    """Rebuild a multipart upload: sampled uploads replay their real body, others a same-size filler"""
+    if "data" in upload:
+        data = base64.b64decode(upload["data"])
+    else:
+        data = b"\0" * upload.get("size", 0)
+
+    form = aiohttp.FormData()
+    form.add_field(
+        upload.get("field", "image"), data, filename=upload.get("filename", "replay.png")
+    )
+    return form
+
+
+async def replay_request(session, target, record):
+    """Re-issue one recorded request and return (endpoint, status, latency)"""
+    kwargs = {}
+    if "upload" in record:
+        kwargs["data"] = build_upload(record["upload"])
+    elif "body" in record or "body_b64" in record:
+        # Text bodies were stored as-is, binary ones base64 encoded
+        if "body_b64" in record:
+            kwargs["data"] = base64.b64decode(record["body_b64"])
+        else:
+            kwargs["data"] = record["body"].encode("utf-8")
+        if record.get("content_type"):
+            kwargs["headers"] = {"Content-Type": record["content_type"]}
+
+    endpoint = f"{record['method']} {record.get('endpoint', record['path'])}"
+    start = time.monotonic()
+    try:
+        async with session.request(record["method"], target + record["path"], **kwargs) as response:
+            await response.read()
+            status = response.status
+    except Exception as e:
+        status = type(e).__name__  # Connection errors / timeouts are reported by name
+    return endpoint, status, time.monotonic() - start
+
+
+async def replay(records, target, speed, concurrency):
+    """Replay the records at speed x the recorded pace (speed None = as fast as possible)"""
+    semaphore = asyncio.Semaphore(concurrency) if speed is None else None
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        start = time.monotonic()
+
+        async def scheduled(record):
+            if speed is None:
+                async with semaphore:
+                    return await replay_request(session, target, record)
+            # Open loop: keep the recorded arrival times regardless of how slow responses are
+            delay = record.get("t", 0) / speed - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return await replay_request(session, target, record)
+
+        results = await asyncio.gather(*(scheduled(record) for record in records))
+        wall_time = time.monotonic() - start
+
+    return results, wall_time
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None for an empty list)"""
+    # NOTE: copy of the helper in comfyui-workflow-runner.py (the scripts are standalone
+    # and can't import each other), keep both in sync
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize_results(results, wall_time):
+    """Per-endpoint throughput, latency percentiles and error rate"""
+    endpoints = {}
+    for endpoint, status, latency in results:
+        endpoints.setdefault(endpoint, []).append((status, latency))
+
+    summary = {"requests": len(results), "wall_time": round(wall_time, 3), "endpoints": {}}
+    for endpoint, samples in sorted(endpoints.items()):
+        latencies = [latency * 1000 for _, latency in samples]
+        errors = sum(1 for status, _ in samples if not isinstance(status, int) or status >= 400)
+        statuses = {}
+        for status, _ in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        summary["endpoints"][endpoint] = {
+            "requests": len(samples),
+            "throughput": round(len(samples) / wall_time, 2) if wall_time else None,
+            "error_rate": round(errors / len(samples), 4),
+            "statuses": statuses,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(max(latencies), 2),
+            },
+        }
+    return summary
+
+
+def print_summary(summary):
+    """Print the replay report as a table"""
+    print(
+        f"\n{Fore.LIGHTCYAN_EX}Replayed {summary['requests']} requests in {summary['wall_time']}s{Style.RESET_ALL}"
+    )
+    print(
+        f"{'endpoint':<32} {'reqs':>6} {'req/s':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses"
+    )
+    for endpoint, stats in summary["endpoints"].items():
+        latency = stats["latency_ms"]
+        color = Fore.LIGHTRED_EX if stats["error_rate"] else Fore.LIGHTGREEN_EX
+        print(
+            f"{color}{endpoint:<32}{Style.RESET_ALL} {stats['requests']:>6} {stats['throughput']:>8} "
+            f"{stats['error_rate'] * 100:>6.1f} {latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9}  "
+            f"{Fore.LIGHTBLACK_EX}{stats['statuses']}{Style.RESET_ALL}"
+        )
+
+
+def parse_speed(value):
+    """'1', '2x', '0.5' -> float multiplier, 'max' -> None"""
+    if value.lower() == "max":
+        return None
+    try:
+        speed = float(value.lower().rstrip("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid speed: {value} (use e.g. 1, 4x or max)")
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive")
+    return speed
+
+
+# Main execution
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay recorded middleware traffic and report throughput, latency and errors"
+    )
+    parser.add_argument("recording", nargs="?", default=RECORDING_FILE)
+    parser.add_argument("--target", default=TARGET, help="Base URL of the runner middleware")
+    parser.add_argument(
+        "--speed", type=parse_speed, default=1.0, help="1 (recorded pace), N / Nx, or max"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=MAX_CONCURRENCY, help="In-flight cap for --speed max"
+    )
+    parser.add_argument("--session", help="Only replay the runner session with this ID")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    records = load_recording(args.recording, args.session)
+    if not records:
+        print(f"{Fore.LIGHTRED_EX}Nothing to replay.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    pace = "max speed" if args.speed is None else f"{args.speed:g}x"
+    print(
+        f"{Fore.LIGHTYELLOW_EX}Replaying {len(records)} requests at {pace} against:{Fore.LIGHTBLACK_EX} {args.target.rstrip('/')} {Style.RESET_ALL}"
+    )
+    results, wall_time = asyncio.run(
+        replay(records, args.target.rstrip("/"), args.speed, args.concurrency)
+    )
+
+    summary = summarize_results(results, wall_time)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)